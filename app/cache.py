@@ -0,0 +1,136 @@
+import gzip
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from dotenv import load_dotenv
+
+# Load environment variables from the .env file
+load_dotenv()
+
+# How long (seconds) fetched weather data is considered the same version. Open-Meteo updates current weather every 15 min
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", 900))
+# Bodies smaller than this (bytes) are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+# Maximum number of payloads kept in memory
+MAX_CACHE_ENTRIES = 128
+
+
+class CachedPayload:
+    def __init__(self, etag, body, media_type, headers=None):
+        self.etag = etag
+        self.body = body
+        self.media_type = media_type
+        self.headers = headers or {}
+        # Compress once per data version, so repeated polls are served straight from memory
+        self.gzip_body = gzip.compress(body) if len(body) >= MIN_COMPRESS_SIZE else None
+
+    def to_response(self, request: Request) -> Response:
+        """
+        Builds the response, serving the gzip encoded body if the client accepts it.
+
+        :param request: Incoming request
+        :return: Response with the cached payload
+        """
+        headers = {**self.headers, "ETag": self.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if self.gzip_body is not None and accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzip_body, media_type=self.media_type, headers=headers)
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+class ResponseCache:
+    def __init__(self, max_entries=MAX_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def weather_version(cities_version):
+        """
+        Weather data depends on the cities and changes over time, so its version combines both.
+
+        :param cities_version: Version of the stored cities
+        :return: Weather data version
+        """
+        return f"{cities_version}.{int(time.time() // WEATHER_CACHE_TTL)}"
+
+    @staticmethod
+    def make_etag(*parts):
+        """
+        Creates a weak ETag from the endpoint, its parameters and the data version.
+
+        :param parts: Values identifying the response
+        :return: ETag header value
+        """
+        digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+        return f'W/"{digest[:32]}"'
+
+    def get(self, etag):
+        payload = self._entries.get(etag)
+        if payload is not None:
+            self._entries.move_to_end(etag)
+        return payload
+
+    def set(self, etag, body, media_type, headers=None):
+        payload = CachedPayload(etag, body, media_type, headers)
+        self._entries[etag] = payload
+        self._entries.move_to_end(etag)
+        # Evict the least recently used payloads
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return payload
+
+    def clear(self):
+        self._entries.clear()
+
+
+def is_not_modified(request: Request, etag):
+    """
+    Checks the If-None-Match header against the ETag (weak comparison).
+
+    :param request: Incoming request
+    :param etag: Current ETag of the response
+    :return: True if the client already has this version
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+def accepts_gzip(request: Request):
+    """
+    Checks the Accept-Encoding header for gzip with a non-zero quality value.
+    An explicit gzip entry takes precedence over the * wildcard.
+
+    :param request: Incoming request
+    :return: True if the client accepts gzip encoded bodies
+    """
+    qualities = {}
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+
+    quality = qualities.get("gzip", qualities.get("*", 0.0))
+    return quality > 0
+
+
+def not_modified_response(etag):
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+
+
+# Shared in-memory cache for the API responses
+response_cache = ResponseCache()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -10,9 +10,33 @@ load_dotenv()
 # Database URL for SQLite
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
+# SQLite tuning applied to every new connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # Readers don't block the writer and vice versa
+    "synchronous": "NORMAL",  # Safe with WAL, avoids an fsync on every commit
+    "mmap_size": 268435456,  # Memory-map up to 256 MB of the database file
+    "cache_size": -64000,  # Page cache size in KiB (negative value), here ~64 MB
+}
+
 # Set up the database engine
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Applies SQLITE_PRAGMAS on each new SQLite connection.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
 # Session to interact with the DB
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,9 +1,8 @@
 from enum import Enum
 
-from fastapi import FastAPI, Response, HTTPException, Depends
+from fastapi import FastAPI, Request, Response, HTTPException, Depends
 from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.security.api_key import APIKey
-from fastapi.responses import FileResponse
 from typing import Optional, List
 import os
 
@@ -12,6 +11,7 @@ from app.utils.database_init import initialize_database
 from app.operations import CitiesOperations, WeatherOperations
 from app.process_data import process_weather_data, weather_vizualization
 from app.auth import get_api_key
+from app.cache import response_cache, is_not_modified, not_modified_response
 
 
 # Define an Enum for value_column options
@@ -37,19 +37,29 @@ async def on_startup():
 
 # Endpoint to get all cities
 @app.get("/cities")
-async def get_cities(city_names: Optional[str] = None, api_key: APIKey = Depends(get_api_key)):
+async def get_cities(request: Request, city_names: Optional[str] = None, api_key: APIKey = Depends(get_api_key)):
     """
     Returns all the cities from the database
 
+    :param request: Incoming request \n
     :param api_key: API Key \n
     :param city_names: Name of the city (optional), needs to be separated by comma (,) \n
     :return: cities records from database \n
     """
-    cities_operations = CitiesOperations()
-    cities = cities_operations.get_cities(city_names=city_names)
-    cities_dict = [cities_operations.city_to_dict(city) for city in cities]
+    etag = response_cache.make_etag("cities", city_names, CitiesOperations().get_cities_version())
+    # Client already has this version
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
 
-    return JSONResponse(content={"cities": cities_dict}, status_code=200)
+    payload = response_cache.get(etag)
+    if payload is None:
+        cities_operations = CitiesOperations()
+        cities = cities_operations.get_cities(city_names=city_names)
+        cities_dict = [cities_operations.city_to_dict(city) for city in cities]
+        body = JSONResponse(content={"cities": cities_dict}).body
+        payload = response_cache.set(etag, body, "application/json")
+
+    return payload.to_response(request)
 
 
 # Endpoint to add a new city
@@ -70,6 +80,7 @@ async def create_city(city_names: List[str], api_key: APIKey = Depends(get_api_k
 # Endpoint to fetch weather data and return it as JSON
 @app.get("/weather/")
 async def get_weather(
+        request: Request,
         rank_by: Optional[DataTypesEnum] = "Temperature (C)",
         cities_quantity: Optional[int] = None,
         city_names: Optional[str] = None,
@@ -77,6 +88,7 @@ async def get_weather(
     """
     Processes weather data and returns it as json response
 
+    :param request: Incoming request\n
     :param rank_by: To specify by which field processed data should be sorted \n
     :param api_key: API Key\n
     :param city_names:  Name of the cities, seperated by , (comma)  (Optional)\n
@@ -92,16 +104,29 @@ async def get_weather(
             detail="Error: Only one of 'cities_quantity' or 'city_name' should be provided. Please choose only one."
         )
 
-    # Fetch weather data for predefined cities
-    data = await WeatherOperations().fetch_weather_data_for_cities(cities_quantity, city_names)
-    # Process the data using pandas
-    processed_data = process_weather_data(weather_data=data, rank_by=rank_by)
+    cities_version = CitiesOperations().get_cities_version()
+    etag = response_cache.make_etag("weather", DataTypesEnum(rank_by).value, cities_quantity, city_names,
+                                    response_cache.weather_version(cities_version))
+    # Client already has this version, skip fetching and processing
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    payload = response_cache.get(etag)
+    if payload is None:
+        # Fetch weather data for predefined cities
+        data = await WeatherOperations().fetch_weather_data_for_cities(cities_quantity, city_names)
+        # Process the data using pandas
+        processed_data = process_weather_data(weather_data=data, rank_by=rank_by)
+        body = JSONResponse(content={"weather_data": processed_data}).body
+        payload = response_cache.set(etag, body, "application/json")
+
     # Return processed data
-    return JSONResponse(content={"weather_data": processed_data}, status_code=200)
+    return payload.to_response(request)
 
 
 @app.get("/download-csv/")
 async def download_csv_of_processed_weather_data(
+        request: Request,
         rank_by: Optional[DataTypesEnum] = "Temperature (C)",
         cities_quantity: Optional[int] = None,
         city_names: Optional[str] = None,
@@ -109,6 +134,7 @@ async def download_csv_of_processed_weather_data(
     """
     Processes weather data and downloads CSV for a city based on a name
 
+    :param request: Incoming request \n
     :param rank_by: To specify by which field processed data should be sorted \n
     :param api_key: API Key \n
     :param city_names:  Name of the cities, seperated by , (comma)  (Optional) \n
@@ -125,17 +151,33 @@ async def download_csv_of_processed_weather_data(
             detail="Error: Only one of 'cities_quantity' or 'city_names' should be provided. Please choose only one."
         )
 
-    # Fetch weather data
-    data = await WeatherOperations().fetch_weather_data_for_cities(cities_quantity, city_names)
-
-    # Process the data using pandas
-    file_path = "weather_data.csv"  # File location
-    process_weather_data(weather_data=data, rank_by=rank_by, file_path=file_path)
-
-    if os.path.exists(file_path):  # Check if the file exists
-        return FileResponse(file_path, media_type='text/csv', filename="weather_data.csv")
-    # If the file does not exist, return an error message
-    return Response(content="CSV file not found", status_code=404)
+    cities_version = CitiesOperations().get_cities_version()
+    etag = response_cache.make_etag("download-csv", DataTypesEnum(rank_by).value, cities_quantity, city_names,
+                                    response_cache.weather_version(cities_version))
+    # Client already has this version, skip fetching and processing
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    payload = response_cache.get(etag)
+    if payload is None:
+        # Fetch weather data
+        data = await WeatherOperations().fetch_weather_data_for_cities(cities_quantity, city_names)
+
+        # Process the data using pandas
+        file_path = "weather_data.csv"  # File location
+        process_weather_data(weather_data=data, rank_by=rank_by, file_path=file_path)
+
+        if not os.path.exists(file_path):  # Check if the file exists
+            # If the file does not exist, return an error message
+            return Response(content="CSV file not found", status_code=404)
+
+        with open(file_path, "rb") as csv_file:
+            body = csv_file.read()
+        payload = response_cache.set(
+            etag, body, "text/csv",
+            headers={"Content-Disposition": 'attachment; filename="weather_data.csv"'})
+
+    return payload.to_response(request)
 
 
 @app.get("/weather-visualization")
@@ -1,12 +1,37 @@
-from sqlalchemy import Column, String, Integer, Float
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, String, Integer, Float, DateTime
+from sqlalchemy.orm import validates
 from app.database import Base
 
 
+def normalize_city_name(name):
+    """
+    Normalizes a city name for lookups: trims it, collapses inner whitespace and casefolds it.
+
+    :param name: City name as provided by the user
+    :return: Normalized city name
+    """
+    return " ".join(name.split()).casefold()
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
 class City(Base):
     __tablename__ = 'cities'
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
+    normalized_name = Column(String, unique=True, index=True, nullable=False)
     latitude = Column(Float)
     longitude = Column(Float)
+    # Set on every insert/update, used to tell whether the stored cities have changed
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False, index=True)
 
+    @validates("name")
+    def _set_normalized_name(self, key, name):
+        # Keep the normalized name in sync whenever the display name is set
+        self.normalized_name = normalize_city_name(name) if name is not None else None
+        return name
@@ -1,6 +1,7 @@
 from app.database import SessionLocal
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from fastapi import HTTPException
 import logging
 import asyncio
@@ -27,8 +28,9 @@ class CitiesOperations:
 
     @staticmethod
     def city_to_dict(city):
-        # Convert the SQLAlchemy model instance to a dictionary
-        return {column.name: getattr(city, column.name) for column in city.__table__.columns}
+        # Convert the SQLAlchemy model instance to a dictionary, leaving out internal columns
+        return {column.name: getattr(city, column.name) for column in city.__table__.columns
+                if column.name not in ("normalized_name", "updated_at")}
 
     def create_city(self, city_names):
         """
@@ -41,12 +43,14 @@ class CitiesOperations:
         try:
             # Get lat/long from the external connector
             for name in city_names:
-                name = name.capitalize()
+                name = " ".join(name.split())
                 lat, long = CitiesConnector().get_lat_long_from_city(name)
 
                 if lat and long:
-                    # Check if the city already exists in the database
-                    existing_city = self.db.query(models.City).filter(models.City.name == name).first()
+                    # Check if the city already exists in the database (case-insensitive)
+                    normalized_name = models.normalize_city_name(name)
+                    existing_city = self.db.query(models.City).filter(
+                        models.City.normalized_name == normalized_name).first()
 
                     if existing_city:
                         # If the city exists, update its latitude and longitude
@@ -58,7 +62,16 @@ class CitiesOperations:
                         # If the city does not exist, create a new city record
                         db_city = models.City(name=name, latitude=lat, longitude=long)
                         self.db.add(db_city)
-                        self.db.commit()  # Commit the new city to the database
+                        try:
+                            self.db.commit()  # Commit the new city to the database
+                        except IntegrityError:
+                            # Another request created the same city in the meantime, update it instead
+                            self.db.rollback()
+                            db_city = self.db.query(models.City).filter(
+                                models.City.normalized_name == normalized_name).one()
+                            db_city.latitude = lat
+                            db_city.longitude = long
+                            self.db.commit()
                         self.db.refresh(db_city)  # Refresh the city record to get the latest info
         except Exception as e:
             self.db.rollback()  # Rollback the transaction if something goes wrong
@@ -66,6 +79,27 @@ class CitiesOperations:
         finally:
             self.db.close()  # Close the session when done
 
+    def get_cities_version(self):
+        """
+        Returns a version of the stored cities, derived from the number of cities, the highest id and
+        the latest 'updated_at'. Any city added, removed or updated through the models changes it,
+        and it is the same across processes and restarts.
+
+        :return: Cities version
+        """
+        # Cheap aggregates served from the indexes, so a conditional request doesn't load every city.
+        # The trade-off: changes made with raw SQL that don't touch 'updated_at' aren't detected.
+        try:
+            count, max_id, last_update = self.db.query(
+                func.count(models.City.id), func.max(models.City.id), func.max(models.City.updated_at)
+            ).one()
+            return f"{count}.{max_id}.{last_update}"
+        except SQLAlchemyError as e:
+            logger.error(f"Database error while fetching cities version: {str(e)}")
+            raise HTTPException(status_code=500, detail="An error occurred while fetching cities from the database.")
+        finally:
+            self.db.close()
+
     def get_cities(self, quantity=None, city_names=None):
         """
         Returns existing cities records from the database.
@@ -80,8 +114,8 @@ class CitiesOperations:
             # If list of city names was provided
             elif city_names:
                 cities_list = city_names.split(',')
-                cities_list = [city.strip().capitalize() for city in cities_list]
-                cities = self.db.query(models.City).filter(models.City.name.in_(cities_list)).all()
+                cities_list = [models.normalize_city_name(city) for city in cities_list]
+                cities = self.db.query(models.City).filter(models.City.normalized_name.in_(cities_list)).all()
             # Returns everything from db
             else:
                 cities = self.db.query(models.City).all()
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Use a throwaway SQLite database and a known API key for the tests
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test_cities.db')}")
+os.environ.setdefault("API_KEY", "secret")
@@ -0,0 +1,79 @@
+import gzip
+from types import SimpleNamespace
+
+from app.cache import ResponseCache, is_not_modified, accepts_gzip, MIN_COMPRESS_SIZE
+
+
+def make_request(**headers):
+    """Helper to build a minimal request object with the given headers."""
+    return SimpleNamespace(headers={key.replace("_", "-"): value for key, value in headers.items()})
+
+
+def test_weather_version_depends_on_cities_version():
+    """Test that the weather data version changes when cities data changes."""
+    assert ResponseCache.weather_version("a") == ResponseCache.weather_version("a")
+    assert ResponseCache.weather_version("a") != ResponseCache.weather_version("b")
+
+
+def test_is_not_modified():
+    """Test If-None-Match matching, including weak and wildcard tags."""
+    etag = ResponseCache.make_etag("weather", "Temperature (C)")
+
+    assert is_not_modified(make_request(if_none_match=etag), etag)
+    assert is_not_modified(make_request(if_none_match=f'"other", {etag.removeprefix("W/")}'), etag)
+    assert is_not_modified(make_request(if_none_match="*"), etag)
+    assert not is_not_modified(make_request(if_none_match='"other"'), etag)
+    assert not is_not_modified(make_request(), etag)
+
+
+def test_accepts_gzip():
+    """Test Accept-Encoding parsing."""
+    assert accepts_gzip(make_request(accept_encoding="gzip, deflate, br"))
+    assert accepts_gzip(make_request(accept_encoding="br;q=1.0, gzip;q=0.8"))
+    assert not accepts_gzip(make_request(accept_encoding="gzip;q=0"))
+    assert not accepts_gzip(make_request(accept_encoding="br"))
+    assert accepts_gzip(make_request(accept_encoding="*;q=0, gzip"))
+    assert not accepts_gzip(make_request(accept_encoding="gzip;q=0, *"))
+    assert accepts_gzip(make_request(accept_encoding="br, *"))
+    assert accepts_gzip(make_request(accept_encoding="gzip;level=1"))
+    assert accepts_gzip(make_request(accept_encoding="gzip; level=1; q=0.5"))
+    assert not accepts_gzip(make_request())
+
+
+def test_large_payload_is_precompressed():
+    """Test that large payloads are compressed once and served gzip encoded."""
+    cache = ResponseCache()
+    body = b"City,Temperature (C)\n" * MIN_COMPRESS_SIZE
+    payload = cache.set('W/"etag"', body, "text/csv")
+
+    assert cache.get('W/"etag"') is payload
+    assert gzip.decompress(payload.gzip_body) == body
+
+    response = payload.to_response(make_request(accept_encoding="gzip"))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"etag"'
+
+    response = payload.to_response(make_request())
+    assert "content-encoding" not in response.headers
+    assert response.body == body
+
+
+def test_small_payload_is_not_compressed():
+    """Test that small payloads are served as is."""
+    payload = ResponseCache().set('W/"etag"', b'{"cities": []}', "application/json")
+
+    assert payload.gzip_body is None
+    assert "content-encoding" not in payload.to_response(make_request(accept_encoding="gzip")).headers
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache does not grow beyond its limit."""
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", b"a", "text/plain")
+    cache.set("b", b"b", "text/plain")
+    cache.get("a")
+    cache.set("c", b"c", "text/plain")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
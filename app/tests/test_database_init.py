@@ -0,0 +1,130 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from app import models
+from app.database import engine
+from app.utils import database_init
+
+OLD_SCHEMA = """
+CREATE TABLE cities (id INTEGER NOT NULL, name VARCHAR, latitude FLOAT, longitude FLOAT, PRIMARY KEY (id));
+CREATE INDEX ix_cities_id ON cities (id);
+CREATE INDEX ix_cities_name ON cities (name);
+"""
+
+OLD_ROWS = [
+    (1, "Paris", 48.8566, 2.3522),
+    (2, "PARIS", 0.0, 0.0),
+    (3, None, 0.0, 0.0),
+    (5, "Tbilisi", 41.7151, 44.8271),
+]
+
+
+@pytest.fixture
+def old_database(tmp_path, monkeypatch):
+    """Fixture to provide a temp-file SQLite database in the schema before 'normalized_name' was added."""
+    db_path = tmp_path / "old_cities.db"
+    connection = sqlite3.connect(db_path)
+    connection.executescript(OLD_SCHEMA)
+    connection.executemany("INSERT INTO cities VALUES (?, ?, ?, ?)", OLD_ROWS)
+    connection.commit()
+    connection.close()
+
+    monkeypatch.setattr(database_init, "engine", create_engine(f"sqlite:///{db_path}"))
+    return db_path
+
+
+def read_cities(db_path):
+    """Helper to read all the rows of the cities table."""
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute(
+            "SELECT id, name, normalized_name, latitude, longitude FROM cities ORDER BY id").fetchall()
+    finally:
+        connection.close()
+
+
+def test_migration_rebuilds_table(old_database):
+    """Test that the migration skips NULL names and duplicates, keeps ids and matches a fresh schema."""
+    database_init.migrate_cities_normalized_name()
+
+    assert read_cities(old_database) == [
+        (1, "Paris", "paris", 48.8566, 2.3522),
+        (5, "Tbilisi", "tbilisi", 41.7151, 44.8271),
+    ]
+
+    inspector = inspect(database_init.engine)
+    assert set(inspector.get_table_names()) == {"cities"}
+    columns = {column["name"]: column for column in inspector.get_columns("cities")}
+    assert columns["normalized_name"]["nullable"] is False
+    indexes = {index["name"]: index for index in inspector.get_indexes("cities")}
+    assert indexes["ix_cities_normalized_name"]["unique"]
+    assert {"ix_cities_id", "ix_cities_name"} <= set(indexes)
+
+
+def test_migration_is_safe_to_run_twice(old_database):
+    """Test that running the migration on a migrated database changes nothing."""
+    database_init.migrate_cities_normalized_name()
+    rows = read_cities(old_database)
+
+    database_init.migrate_cities_normalized_name()
+
+    assert read_cities(old_database) == rows
+
+
+def test_failed_migration_leaves_database_untouched(old_database, monkeypatch):
+    """Test that a failure in the middle of copying rolls back the whole rebuild."""
+    def failing_normalize(name):
+        if name == "Tbilisi":
+            raise ValueError("Failure while copying")
+        return " ".join(name.split()).casefold()
+
+    monkeypatch.setattr(models, "normalize_city_name", failing_normalize)
+    with pytest.raises(ValueError):
+        database_init.migrate_cities_normalized_name()
+
+    inspector = inspect(database_init.engine)
+    assert set(inspector.get_table_names()) == {"cities"}
+    assert "normalized_name" not in [column["name"] for column in inspector.get_columns("cities")]
+    connection = sqlite3.connect(old_database)
+    assert connection.execute("SELECT id, name, latitude, longitude FROM cities ORDER BY id").fetchall() == OLD_ROWS
+    connection.close()
+
+
+def test_migration_resumes_from_leftover_table(old_database):
+    """Test that a 'cities_old' table left by an interrupted migration is migrated instead of being lost."""
+    connection = sqlite3.connect(old_database)
+    connection.executescript("""
+        ALTER TABLE cities RENAME TO cities_old;
+        DROP INDEX ix_cities_id;
+        DROP INDEX ix_cities_name;
+    """)
+    connection.close()
+    models.City.__table__.create(bind=database_init.engine)
+
+    database_init.migrate_cities_normalized_name()
+
+    assert [row[1] for row in read_cities(old_database)] == ["Paris", "Tbilisi"]
+    assert set(inspect(database_init.engine).get_table_names()) == {"cities"}
+
+
+def test_migration_aborts_with_leftover_table_and_data(old_database):
+    """Test that the migration doesn't guess when both the leftover and the new table hold cities."""
+    connection = sqlite3.connect(old_database)
+    connection.execute("ALTER TABLE cities RENAME TO cities_old")
+    connection.execute("CREATE TABLE cities (id INTEGER PRIMARY KEY, name VARCHAR, normalized_name VARCHAR NOT NULL)")
+    connection.execute("INSERT INTO cities VALUES (1, 'London', 'london')")
+    connection.commit()
+    connection.close()
+
+    with pytest.raises(RuntimeError):
+        database_init.migrate_cities_normalized_name()
+
+
+def test_sqlite_pragmas_are_applied():
+    """Test that new connections use the tuned SQLite settings."""
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == -64000
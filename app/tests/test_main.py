@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.cache import response_cache
+
+HEADERS = {"access_token": "secret"}
+
+# Enough cities for the payloads to be precompressed
+WEATHER_DATA = [
+    {"City": f"City {i}", "Temperature (C)": 10.0 + i, "Wind Speed (m/s)": 2.0 + i, "Humidity (%)": None}
+    for i in range(30)
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Fixture to provide a test client with an empty response cache."""
+    # The CSV endpoint writes its file into the working directory
+    monkeypatch.chdir(tmp_path)
+    response_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def mocked_fetch():
+    """Fixture to mock fetching weather data from the external API."""
+    with patch("app.main.WeatherOperations.fetch_weather_data_for_cities",
+               new=AsyncMock(return_value=WEATHER_DATA)) as fetch:
+        yield fetch
+
+
+@pytest.mark.parametrize("url", ["/weather/", "/download-csv/"])
+def test_if_none_match_returns_304_without_fetching(client, mocked_fetch, url):
+    """Test that a matching If-None-Match skips fetching and processing weather data."""
+    response = client.get(url, headers=HEADERS)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    mocked_fetch.assert_called_once()
+
+    mocked_fetch.reset_mock()
+    response_cache.clear()
+    response = client.get(url, headers={**HEADERS, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    mocked_fetch.assert_not_called()
+
+
+def test_repeated_request_is_served_from_cache(client, mocked_fetch):
+    """Test that an identical request doesn't fetch the weather data again."""
+    first = client.get("/weather/", headers=HEADERS)
+    second = client.get("/weather/", headers=HEADERS)
+
+    assert first.json() == second.json()
+    mocked_fetch.assert_called_once()
+
+
+def test_default_rank_by_shares_etag(client, mocked_fetch):
+    """Test that omitting rank_by and passing its default value produce the same ETag."""
+    default = client.get("/weather/", headers=HEADERS)
+    explicit = client.get("/weather/", params={"rank_by": "Temperature (C)"}, headers=HEADERS)
+
+    assert default.headers["etag"] == explicit.headers["etag"]
+    mocked_fetch.assert_called_once()
+
+
+def test_post_cities_changes_etag(client):
+    """Test that adding a city changes the /cities ETag."""
+    etag = client.get("/cities", headers=HEADERS).headers["etag"]
+
+    with patch("app.operations.CitiesConnector.get_lat_long_from_city", return_value=(34.0522, -118.2437)):
+        response = client.post("/cities", json=["Los Angeles"], headers=HEADERS)
+    assert response.status_code == 200
+
+    response = client.get("/cities", headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "Los Angeles" in [city["name"] for city in response.json()["cities"]]
+
+
+def test_large_payload_served_gzip_encoded(client, mocked_fetch):
+    """Test that large payloads are served gzip encoded to clients accepting it."""
+    response = client.get("/weather/", headers={**HEADERS, "Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["weather_data"]) == len(WEATHER_DATA)
+
+    response = client.get("/weather/", headers={**HEADERS, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert len(response.json()["weather_data"]) == len(WEATHER_DATA)
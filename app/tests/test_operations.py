@@ -3,6 +3,9 @@ from unittest.mock import MagicMock, patch
 from sqlalchemy.orm import Session
 from fastapi.exceptions import HTTPException
 from app.operations import CitiesOperations
+from app.models import City, normalize_city_name
+from app.database import Base, engine, SessionLocal
+from sqlalchemy.orm import Query
 
 
 @pytest.fixture
@@ -47,6 +50,35 @@ def test_create_city_add_new_city(mocked_db_session, mocked_connector, cities_op
     mocked_db_session.commit.assert_called_once()
 
 
+def test_normalize_city_name():
+    """Test that city names are trimmed, whitespace-collapsed and casefolded."""
+    assert normalize_city_name("  New   YORK ") == "new york"
+    assert normalize_city_name("Rio de Janeiro") == normalize_city_name("rio DE janeiro")
+
+
+def test_city_model_sets_normalized_name():
+    """Test that setting a city name keeps the normalized name in sync."""
+    city = City(name="Cape Town", latitude=-33.9249, longitude=18.4241)
+    assert city.normalized_name == "cape town"
+
+    city.name = "CAPE  TOWN"
+    assert city.normalized_name == "cape town"
+
+
+def test_city_model_without_name():
+    """Test that a missing city name leaves the normalized name unset instead of failing."""
+    city = City(name=None)
+    assert city.normalized_name is None
+
+
+def test_city_to_dict_hides_normalized_name():
+    """Test that the internal normalized name is not part of the API response."""
+    city = City(id=1, name="Paris", latitude=48.8566, longitude=2.3522)
+    assert CitiesOperations.city_to_dict(city) == {
+        "id": 1, "name": "Paris", "latitude": 48.8566, "longitude": 2.3522
+    }
+
+
 # Test get_cities method
 def test_get_cities_by_quantity(mocked_db_session, cities_operations):
     """Test fetching a limited number of cities."""
@@ -97,3 +129,38 @@ def test_get_cities_no_results(mocked_db_session, cities_operations):
     # Assert the exception is raised with the correct status and detail
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "No cities found in the database."
+
+
+def test_create_city_created_concurrently():
+    """Test that a city created by another request between the lookup and the insert gets updated."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(City(name="Kutaisi", latitude=0.0, longitude=0.0))
+    db.commit()
+    db.close()
+
+    # The lookup doesn't see the city yet, so the insert hits the unique index
+    with patch("app.operations.CitiesConnector") as MockConnector, patch.object(Query, "first", return_value=None):
+        MockConnector.return_value.get_lat_long_from_city.return_value = (42.2679, 42.6946)
+        CitiesOperations().create_city(["kutaisi"])
+
+    db = SessionLocal()
+    cities = db.query(City).filter(City.normalized_name == "kutaisi").all()
+    db.close()
+    assert [(city.name, city.latitude, city.longitude) for city in cities] == [("Kutaisi", 42.2679, 42.6946)]
+
+
+def test_cities_version_changes_on_update():
+    """Test that updating a city's coordinates changes the cities version."""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(City(name="Batumi", latitude=0.0, longitude=0.0))
+    db.commit()
+    db.close()
+    version = CitiesOperations().get_cities_version()
+
+    with patch("app.operations.CitiesConnector") as MockConnector:
+        MockConnector.return_value.get_lat_long_from_city.return_value = (41.6168, 41.6367)
+        CitiesOperations().create_city(["Batumi"])
+
+    assert CitiesOperations().get_cities_version() != version
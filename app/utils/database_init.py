@@ -1,6 +1,7 @@
 from sqlalchemy.exc import SQLAlchemyError
 import logging
-from sqlalchemy import inspect
+from sqlalchemy import inspect, text, MetaData
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.orm import Session
 
 from app import models
@@ -39,6 +40,77 @@ def check_if_table_exists(table_name: str):
         logger.info(f"Table '{table_name}' already exists. No action needed.")
 
 
+def migrate_cities_normalized_name():
+    """
+    Rebuilds an existing "cities" table that is missing columns of models.City (e.g. 'normalized_name').
+    SQLite can't add a NOT NULL column to a populated table, so the rows are copied into a new table which then
+    replaces the old one. Rows without a name and duplicates (same normalized name) are skipped, keeping the oldest
+    record.
+
+    A "cities_old" table left behind by an interrupted migration of an earlier version is used as the source again,
+    as long as "cities" is still empty. Otherwise the migration is aborted, so the old data is never lost.
+    """
+    inspector = inspect(engine)
+    source_table = "cities"
+    if inspector.has_table("cities_old"):
+        with engine.connect() as connection:
+            cities_count = connection.execute(text("SELECT COUNT(*) FROM cities")).scalar()
+        if cities_count:
+            raise RuntimeError(
+                "Found table 'cities_old' left by an interrupted migration next to a non-empty 'cities' table. "
+                "Merge them manually and drop 'cities_old' before starting the application."
+            )
+        logger.warning("Found table 'cities_old' left by an interrupted migration. Resuming the migration from it.")
+        source_table = "cities_old"
+    else:
+        columns = {column["name"] for column in inspector.get_columns("cities")}
+        if set(models.City.__table__.columns.keys()) <= columns:
+            logger.info("Table 'cities' is up to date. No migration needed.")
+            return
+
+    source_columns = [column["name"] for column in inspector.get_columns(source_table)]
+    copied_columns = [name for name in models.City.__table__.columns.keys()
+                      if name in source_columns and name != "normalized_name"]
+    new_table = models.City.__table__.to_metadata(MetaData(), name="cities_new")
+
+    logger.info(f"Migrating 'cities' table from '{source_table}'...")
+    # pysqlite runs DDL outside of its implicit transactions, so the transaction is managed explicitly
+    # to make the whole rebuild atomic
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.exec_driver_sql("BEGIN")
+        try:
+            connection.exec_driver_sql("DROP TABLE IF EXISTS cities_new")
+            # Only the table, its indexes are created after the rename since index names are global in SQLite
+            connection.execute(CreateTable(new_table))
+
+            seen = set()
+            rows = connection.execute(text(
+                f"SELECT {', '.join(copied_columns)} FROM {source_table} ORDER BY id"
+            )).mappings().fetchall()
+            for row in rows:
+                if row["name"] is None:
+                    logger.warning(f"Skipping city without a name (id={row['id']}).")
+                    continue
+                normalized_name = models.normalize_city_name(row["name"])
+                if normalized_name in seen:
+                    logger.warning(f"Skipping duplicate city '{row['name']}' (id={row['id']}).")
+                    continue
+                seen.add(normalized_name)
+                connection.execute(new_table.insert(), {**row, "normalized_name": normalized_name})
+
+            # Swap the tables as the last step
+            connection.exec_driver_sql("DROP TABLE IF EXISTS cities_old")
+            connection.exec_driver_sql("DROP TABLE cities")
+            connection.exec_driver_sql("ALTER TABLE cities_new RENAME TO cities")
+            for index in models.City.__table__.indexes:
+                index.create(bind=connection)
+            connection.exec_driver_sql("COMMIT")
+        except Exception:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+    logger.info("Table 'cities' has been migrated successfully.")
+
+
 def initialize_database():
     """
     Checks if the database is empty. If it is, adds predefined cities.
@@ -47,6 +119,8 @@ def initialize_database():
     try:
         # Ensure the "cities" table exists
         check_if_table_exists("cities")
+        # Bring tables created by older versions up to date
+        migrate_cities_normalized_name()
 
         # Check if the database is empty
         if not db.query(models.City).first():